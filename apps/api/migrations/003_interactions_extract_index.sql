@@ -0,0 +1,6 @@
+-- Covering index for the time-windowed feature-extraction scans
+-- (materialize_features.py filters on created_at and groups by user/track).
+
+CREATE INDEX IF NOT EXISTS idx_interactions_created_user
+ON interactions(created_at, external_user_id)
+INCLUDE (track_id, event_type);
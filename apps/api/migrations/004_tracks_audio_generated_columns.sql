@@ -0,0 +1,12 @@
+-- Prematerialize the audio_features JSON fields as stored generated columns
+-- so feature extraction scans plain float columns instead of re-parsing
+-- JSONB on every materialization run.
+
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS energy float GENERATED ALWAYS AS ((audio_features->>'energy')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS valence float GENERATED ALWAYS AS ((audio_features->>'valence')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS danceability float GENERATED ALWAYS AS ((audio_features->>'danceability')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS acousticness float GENERATED ALWAYS AS ((audio_features->>'acousticness')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS instrumentalness float GENERATED ALWAYS AS ((audio_features->>'instrumentalness')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS tempo float GENERATED ALWAYS AS ((audio_features->>'tempo')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS loudness float GENERATED ALWAYS AS ((audio_features->>'loudness')::float) STORED;
+ALTER TABLE tracks ADD COLUMN IF NOT EXISTS speechiness float GENERATED ALWAYS AS ((audio_features->>'speechiness')::float) STORED;
@@ -0,0 +1,47 @@
+-- Range-partition interactions by created_at so the 7/30-day extraction
+-- windows scan only the 1-2 partitions they touch instead of the full heap.
+--
+-- NOTE: requires a maintenance window — the table is rebuilt and rows are
+-- copied. New monthly partitions should be created ahead of time by a cron
+-- job or pg_partman; a three-month runway is created here.
+
+BEGIN;
+
+ALTER TABLE interactions RENAME TO interactions_old;
+
+CREATE TABLE interactions (
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    external_user_id VARCHAR(255) NOT NULL,
+    track_id UUID NOT NULL REFERENCES tracks(id) ON DELETE CASCADE,
+    event_type event_type NOT NULL,
+    event_value INTEGER,
+    context JSONB,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- partition key must be part of the primary key
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Catch-all for rows predating the monthly runway
+CREATE TABLE interactions_p_default PARTITION OF interactions DEFAULT;
+
+CREATE TABLE interactions_p_2026_08 PARTITION OF interactions
+    FOR VALUES FROM ('2026-08-01') TO ('2026-09-01');
+CREATE TABLE interactions_p_2026_09 PARTITION OF interactions
+    FOR VALUES FROM ('2026-09-01') TO ('2026-10-01');
+CREATE TABLE interactions_p_2026_10 PARTITION OF interactions
+    FOR VALUES FROM ('2026-10-01') TO ('2026-11-01');
+
+INSERT INTO interactions SELECT * FROM interactions_old;
+DROP TABLE interactions_old;
+
+-- Recreate the indexes; declared on the parent they propagate per-partition,
+-- keeping each index small and cache-resident.
+CREATE INDEX idx_interactions_user_created ON interactions(external_user_id, created_at DESC);
+CREATE INDEX idx_interactions_track ON interactions(track_id);
+CREATE INDEX idx_interactions_event_type ON interactions(event_type);
+CREATE INDEX idx_interactions_created_at ON interactions(created_at DESC);
+CREATE INDEX idx_interactions_user_skip_recent ON interactions(external_user_id, event_type, created_at DESC)
+WHERE event_type = 'SKIP';
+CREATE INDEX idx_interactions_created_user ON interactions(created_at, external_user_id) INCLUDE (track_id, event_type);
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- Daily rollup of interactions so window extracts aggregate pre-counted
+-- days instead of re-scanning raw events. Refresh on a daily cron:
+--
+--     REFRESH MATERIALIZED VIEW CONCURRENTLY interactions_daily;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS interactions_daily AS
+SELECT
+    external_user_id,
+    track_id,
+    event_type,
+    date_trunc('day', created_at) AS day,
+    COUNT(*) AS cnt
+FROM interactions
+GROUP BY 1, 2, 3, 4;
+
+-- Unique index is required for REFRESH ... CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_interactions_daily_key
+ON interactions_daily(external_user_id, track_id, event_type, day);
+
+CREATE INDEX IF NOT EXISTS idx_interactions_daily_day
+ON interactions_daily(day);
@@ -0,0 +1,5 @@
+-- HyperLogLog sketches for approximate distinct counts in the feature
+-- extracts (enabled client-side with FEATURES_USE_HLL=1). Requires the
+-- postgresql-hll package on the server.
+
+CREATE EXTENSION IF NOT EXISTS hll;
@@ -0,0 +1,9 @@
+-- Content-addressed cache for interest-graph LLM responses: re-running
+-- generation for a user whose summary is unchanged hits the cache instead
+-- of paying another LLM round-trip.
+
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key VARCHAR(128) PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
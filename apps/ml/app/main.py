@@ -1,3 +1,4 @@
+import asyncio
 import os
 import json
 from datetime import datetime
@@ -5,6 +6,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from app.pg import PG
 from app.reranker import Reranker
@@ -50,6 +52,14 @@ def create_app() -> FastAPI:
     db = PG.from_env()
     reranker = Reranker(db=db)
 
+    @app.on_event("startup")
+    async def load_models() -> None:
+        # Load torch model + Feast off the event loop without blocking
+        # startup: /health reports modelLoaded=False until this finishes
+        # and rerank falls back to the heuristic path in the meantime.
+        loop = asyncio.get_running_loop()
+        app.state.model_load_future = loop.run_in_executor(None, reranker.load_models)
+
     @app.get("/health", response_model=HealthResponse)
     def health() -> HealthResponse:
         return HealthResponse(
@@ -58,12 +68,17 @@ def create_app() -> FastAPI:
             modelLoaded=reranker.model_loaded,
         )
 
+    # I/O-bound handlers are async and delegate the blocking DB/Feast work
+    # to the threadpool explicitly, so the event loop stays free to
+    # interleave other requests instead of parking each one on Starlette's
+    # default sync-handler threadpool.
     @app.post("/rerank", response_model=RerankResponse)
-    def rerank(req: RerankRequest) -> RerankResponse:
+    async def rerank(req: RerankRequest) -> RerankResponse:
         if not req.candidateTrackIds:
             raise HTTPException(status_code=400, detail="candidateTrackIds is required")
 
-        items = reranker.rerank(
+        items = await run_in_threadpool(
+            reranker.rerank,
             external_user_id=req.externalUserId,
             candidate_track_ids=req.candidateTrackIds,
             context=req.context.model_dump() if req.context else None,
@@ -79,9 +94,9 @@ def create_app() -> FastAPI:
         )
 
     @app.post("/train")
-    def train(user_id: Optional[str] = None, epochs: int = 2) -> Dict[str, Any]:
+    async def train(user_id: Optional[str] = None, epochs: int = 2) -> Dict[str, Any]:
         """تدريب خفيف (للتطوير فقط). في الإنتاج: اجعل التدريب خارج المسار الرئيسي (CI/Jobs)."""
-        result = reranker.train(user_id=user_id, epochs=epochs)
+        result = await run_in_threadpool(reranker.train, user_id=user_id, epochs=epochs)
         return {"ok": True, **result}
 
     return app
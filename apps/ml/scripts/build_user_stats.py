@@ -1,6 +1,7 @@
 import os
 from datetime import datetime, timezone
 
+import numpy as np
 import pandas as pd
 
 from app.pg import PG
@@ -30,10 +31,14 @@ def main() -> None:
         return
 
     df = pd.DataFrame(rows)
-    df["like_rate_7d"] = (df["like_7d"] / (df["play_7d"].replace(0, 1))).astype("float32")
+    # Compute the rate on raw NumPy arrays - skips the pandas Series
+    # machinery and the intermediate .replace() allocation.
+    plays = df["play_7d"].to_numpy(np.int64)
+    likes = df["like_7d"].to_numpy(np.int64)
+    df["like_rate_7d"] = (likes / np.where(plays == 0, 1, plays)).astype(np.float32)
     df["event_timestamp"] = datetime.now(timezone.utc)
 
-    df.to_parquet(out_path, index=False)
+    df.to_parquet(out_path, index=False, compression="snappy")
     print(f"Wrote: {out_path} rows={len(df)}")
 
 
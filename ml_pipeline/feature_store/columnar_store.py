@@ -0,0 +1,61 @@
+"""
+Columnar (SoA) snapshot of float32 feature views in Redis.
+
+Feast يخزّن السمات row-wise (proto لكل entity). للـ feature views ذات
+schema عددي متجانس (track_audio_features, user_audio_preferences) نكتب
+نسخة عمودية إضافية: مفتاح واحد لكل سمة قيمته مصفوفة float32 متجاورة
+عبر كل الكيانات، فيقرأ المستهلك الدفعي كل الأعمدة بـ MGET واحد ويفكّها
+بـ np.frombuffer بدون أي parsing لكل صف.
+
+Keys:
+    fv:{view}:__entities__   newline-joined entity ids (utf-8)
+    fv:{view}:{feature}      raw little-endian float32 column
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# Views whose non-entity columns are all float32 — the only shape this
+# layout supports.
+COLUMNAR_VIEWS = {
+    "track_audio_features": "track_id",
+    "user_audio_preferences": "external_user_id",
+}
+
+
+def write_columnar_snapshot(redis_client, view_name: str, df: pd.DataFrame, entity_column: str) -> int:
+    """اكتب الأعمدة الرقمية لـ view كمصفوفات float32 متجاورة (pipeline واحد)"""
+    entities = "\n".join(str(e) for e in df[entity_column]).encode("utf-8")
+
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.set(f"fv:{view_name}:__entities__", entities)
+
+    written = 0
+    for col in df.columns:
+        if col in (entity_column, "event_timestamp"):
+            continue
+        values = np.ascontiguousarray(df[col].to_numpy(dtype=np.float32))
+        pipe.set(f"fv:{view_name}:{col}", values.tobytes())
+        written += 1
+
+    pipe.execute()
+    return written
+
+
+def read_columnar_snapshot(redis_client, view_name: str, features: List[str]) -> Dict[str, np.ndarray]:
+    """اقرأ أعمدة كاملة في رحلة MGET واحدة وفكّها zero-copy"""
+    keys = [f"fv:{view_name}:__entities__"] + [f"fv:{view_name}:{f}" for f in features]
+    raw = redis_client.mget(keys)
+
+    if raw[0] is None:
+        return {}
+
+    out: Dict[str, np.ndarray] = {
+        "__entities__": np.array(raw[0].decode("utf-8").split("\n"))
+    }
+    for feature, payload in zip(features, raw[1:]):
+        if payload is not None:
+            out[feature] = np.frombuffer(payload, dtype=np.float32)
+    return out
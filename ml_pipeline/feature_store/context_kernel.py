@@ -0,0 +1,136 @@
+"""
+Context scoring kernel for the on-demand feature view.
+
+حلقة واحدة مدمجة بدل سلسلة عمليات NumPy: كل فروع mood/activity تُنفَّذ
+في تمريرة واحدة على الدفعة بدون مصفوفات boolean مؤقتة.
+
+Compiled with numba when available (cache=True so workers reuse the
+on-disk compile); falls back to the vectorized NumPy path otherwise.
+"""
+
+import numpy as np
+
+# String categories are mapped to integer codes at the Feast schema edge so
+# the kernel never touches Python strings. 0 = unknown/other.
+ACTIVITY_CODES = {"EXERCISE": 1, "RELAX": 2, "WORK": 3}
+MOOD_CODES = {"ENERGETIC": 1, "CALM": 2, "HAPPY": 3, "SAD": 4}
+
+# Branchless boost tables indexed by code. Each rule is (comparator, lo, hi,
+# delta): GT passes when x > lo, LT when x < lo, RANGE when lo <= x <= hi.
+# Mood rules compare against energy or valence per _MOOD_USE_VALENCE.
+_CMP_NONE, _CMP_GT, _CMP_LT, _CMP_RANGE = 0, 1, 2, 3
+
+_ACT_CMP = np.array([_CMP_NONE, _CMP_GT, _CMP_LT, _CMP_RANGE], dtype=np.int8)
+_ACT_LO = np.array([0.0, 0.7, 0.4, 0.4], dtype=np.float32)
+_ACT_HI = np.array([0.0, 0.0, 0.0, 0.6], dtype=np.float32)
+_ACT_DELTA = np.array([0.0, 0.3, 0.3, 0.2], dtype=np.float32)
+
+_MOOD_CMP = np.array([_CMP_NONE, _CMP_GT, _CMP_LT, _CMP_GT, _CMP_LT], dtype=np.int8)
+_MOOD_LO = np.array([0.0, 0.6, 0.5, 0.6, 0.4], dtype=np.float32)
+_MOOD_USE_VALENCE = np.array([0.0, 0.0, 0.0, 1.0, 1.0], dtype=np.float32)
+_MOOD_DELTA = np.array([0.0, 0.2, 0.2, 0.2, 0.2], dtype=np.float32)
+
+_KERNEL_SIGNATURE = "void(f4[:], f4[:], f4[:], f4[:], i1[:], i1[:], f4[:], f4[:], f4[:])"
+
+
+def _score_loop(
+    user_energy,
+    user_valence,
+    track_energy,
+    track_valence,
+    act_code,
+    mood_code,
+    out_context,
+    out_energy_match,
+    out_valence_match,
+):
+    for i in range(track_energy.shape[0]):
+        te = track_energy[i]
+        tv = track_valence[i]
+
+        out_energy_match[i] = 1.0 - abs(user_energy[i] - te)
+        out_valence_match[i] = 1.0 - abs(user_valence[i] - tv)
+
+        score = 0.5
+
+        # Branchless: comparator results are 0/1 multipliers on the table
+        # delta, so unpredictable mood/activity mixes cost no mispredicts.
+        a = act_code[i]
+        cmp_a = _ACT_CMP[a]
+        lo_a = _ACT_LO[a]
+        hit_a = (
+            (cmp_a == _CMP_GT) * (te > lo_a)
+            + (cmp_a == _CMP_LT) * (te < lo_a)
+            + (cmp_a == _CMP_RANGE) * ((te >= lo_a) & (te <= _ACT_HI[a]))
+        )
+        score += _ACT_DELTA[a] * hit_a
+
+        m = mood_code[i]
+        cmp_m = _MOOD_CMP[m]
+        lo_m = _MOOD_LO[m]
+        x = te + (tv - te) * _MOOD_USE_VALENCE[m]
+        hit_m = (cmp_m == _CMP_GT) * (x > lo_m) + (cmp_m == _CMP_LT) * (x < lo_m)
+        score += _MOOD_DELTA[m] * hit_m
+
+        if score > 1.0:
+            score = 1.0
+        elif score < 0.0:
+            score = 0.0
+        out_context[i] = score
+
+
+def _score_py(
+    user_energy,
+    user_valence,
+    track_energy,
+    track_valence,
+    act_code,
+    mood_code,
+    out_context,
+    out_energy_match,
+    out_valence_match,
+):
+    """NumPy fallback when numba is unavailable (same results, more temporaries)."""
+    np.subtract(1.0, np.abs(user_energy - track_energy), out=out_energy_match)
+    np.subtract(1.0, np.abs(user_valence - track_valence), out=out_valence_match)
+
+    score = np.full(track_energy.shape, 0.5, dtype=np.float32)
+
+    cmp_a = _ACT_CMP[act_code]
+    lo_a = _ACT_LO[act_code]
+    hit_a = (
+        ((cmp_a == _CMP_GT) & (track_energy > lo_a))
+        | ((cmp_a == _CMP_LT) & (track_energy < lo_a))
+        | ((cmp_a == _CMP_RANGE) & (track_energy >= lo_a) & (track_energy <= _ACT_HI[act_code]))
+    )
+    score += _ACT_DELTA[act_code] * hit_a
+
+    cmp_m = _MOOD_CMP[mood_code]
+    lo_m = _MOOD_LO[mood_code]
+    use_v = _MOOD_USE_VALENCE[mood_code]
+    x = track_energy + (track_valence - track_energy) * use_v
+    hit_m = ((cmp_m == _CMP_GT) & (x > lo_m)) | ((cmp_m == _CMP_LT) & (x < lo_m))
+    score += _MOOD_DELTA[mood_code] * hit_m
+
+    np.clip(score, 0.0, 1.0, out=out_context)
+
+
+try:
+    import numba
+
+    score_context = numba.njit(_KERNEL_SIGNATURE, cache=True, fastmath=True)(_score_loop)
+
+    # Warmup: trigger the (cached) compile at import instead of on the first
+    # serving request.
+    _one_f = np.zeros(1, dtype=np.float32)
+    _one_i = np.zeros(1, dtype=np.int8)
+    score_context(
+        _one_f, _one_f, _one_f, _one_f, _one_i, _one_i,
+        np.empty(1, dtype=np.float32),
+        np.empty(1, dtype=np.float32),
+        np.empty(1, dtype=np.float32),
+    )
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    score_context = _score_py
+    _NUMBA_AVAILABLE = False
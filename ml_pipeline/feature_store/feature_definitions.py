@@ -10,6 +10,10 @@ Feast Feature Definitions for Music Recommendation System
 from datetime import timedelta
 from pathlib import Path
 
+import numpy as np
+
+from context_kernel import ACTIVITY_CODES, MOOD_CODES, score_context
+
 from feast import Entity, FeatureView, Field, PushSource, RedisSource
 from feast.data_source import RequestSource
 from feast.types import Float32, Float64, Int64, String, UnixTimestamp
@@ -179,50 +183,44 @@ context_input = RequestSource(
 )
 def context_aware_features(inputs: dict) -> dict:
     """
-    Compute context-aware matching scores between user preferences and track features
-    """
-    # Extract features
-    mood = inputs.get("mood", ["NEUTRAL"])[0]
-    activity = inputs.get("activity", ["GENERAL"])[0]
-
-    user_energy = inputs.get("avg_energy", [0.5])[0]
-    user_valence = inputs.get("avg_valence", [0.5])[0]
-
-    track_energy = inputs.get("energy", [0.5])[0]
-    track_valence = inputs.get("valence", [0.5])[0]
+    Compute context-aware matching scores between user preferences and track features.
 
-    # Energy matching
-    energy_match = 1.0 - abs(user_energy - track_energy)
+    The scoring itself lives in context_kernel.score_context: a single fused
+    loop (numba-jitted when available) over the batch, with string categories
+    mapped to integer codes here at the schema edge.
+    """
+    mood = inputs.get("mood", ["NEUTRAL"])
+    activity = inputs.get("activity", ["GENERAL"])
 
-    # Valence matching
-    valence_match = 1.0 - abs(user_valence - track_valence)
+    user_energy = np.asarray(inputs.get("avg_energy", [0.5]), dtype=np.float32)
+    user_valence = np.asarray(inputs.get("avg_valence", [0.5]), dtype=np.float32)
 
-    # Context-based adjustments
-    context_score = 0.5
+    track_energy = np.asarray(inputs.get("energy", [0.5]), dtype=np.float32)
+    track_valence = np.asarray(inputs.get("valence", [0.5]), dtype=np.float32)
 
-    if activity == "EXERCISE" and track_energy > 0.7:
-        context_score += 0.3
-    elif activity == "RELAX" and track_energy < 0.4:
-        context_score += 0.3
-    elif activity == "WORK" and 0.4 <= track_energy <= 0.6:
-        context_score += 0.2
+    n = track_energy.shape[0]
+    act_code = np.fromiter(
+        (ACTIVITY_CODES.get(a, 0) for a in activity), dtype=np.int8, count=n
+    )
+    mood_code = np.fromiter(
+        (MOOD_CODES.get(m, 0) for m in mood), dtype=np.int8, count=n
+    )
 
-    if mood == "ENERGETIC" and track_energy > 0.6:
-        context_score += 0.2
-    elif mood == "CALM" and track_energy < 0.5:
-        context_score += 0.2
-    elif mood == "HAPPY" and track_valence > 0.6:
-        context_score += 0.2
-    elif mood == "SAD" and track_valence < 0.4:
-        context_score += 0.2
+    context_score = np.empty(n, dtype=np.float32)
+    energy_match = np.empty(n, dtype=np.float32)
+    valence_match = np.empty(n, dtype=np.float32)
 
-    # Clamp to [0, 1]
-    context_score = max(0.0, min(1.0, context_score))
+    score_context(
+        user_energy, user_valence,
+        track_energy, track_valence,
+        act_code, mood_code,
+        context_score, energy_match, valence_match,
+    )
 
     return {
-        "context_match_score": [context_score],
-        "energy_match": [energy_match],
-        "valence_match": [valence_match],
+        "context_match_score": context_score.tolist(),
+        "energy_match": energy_match.tolist(),
+        "valence_match": valence_match.tolist(),
     }
 
 
@@ -11,263 +11,468 @@ Usage:
 """
 
 import argparse
+import functools
+import io
 import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 from feast import FeatureStore
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+
+try:
+    from feast.data_source import PushMode
+except ImportError:
+    # Fallback for older Feast versions
+    from enum import Enum
+
+    class PushMode(Enum):
+        ONLINE = "online"
+        OFFLINE = "offline"
+
+from columnar_store import COLUMNAR_VIEWS, write_columnar_snapshot
+
+
+# Streamed chunk size for extraction queries: keeps driver-side buffering
+# bounded instead of materializing the whole result set twice (DBAPI rows +
+# DataFrame).
+_READ_CHUNK_ROWS = 50_000
+
+# Rows per store.push() call; keeps each Redis pipeline flush bounded and
+# lets several flushes run in flight.
+_PUSH_CHUNK_ROWS = 5_000
+
+# FEATURES_USE_HLL=1 swaps exact COUNT(DISTINCT ...) for HyperLogLog
+# sketches (~1% error, constant memory per group) — requires migration 007.
+# Unique-count ML features are insensitive to that error.
+_USE_HLL = os.getenv("FEATURES_USE_HLL") == "1"
+
+
+# One Engine per URL per process: each create_engine() call pays DNS + TCP
+# + TLS handshakes and opens its own pool, and materialize_all would do
+# that four times over.
+_ENGINES: Dict[str, Any] = {}
+
+
+def _engine(db_url: str):
+    engine = _ENGINES.get(db_url)
+    if engine is None:
+        # On psycopg3, prepare_threshold=1 turns each repeated extract query
+        # into a server-side prepared statement, so Postgres skips the
+        # parse+plan phase on every run after the first (worth 10-30% on
+        # these short statements when a worker process is reused).
+        # psycopg2 has no equivalent knob; plans are re-generated there.
+        connect_args = {}
+        if db_url.startswith(("postgresql+psycopg://", "postgresql+psycopg_async://")):
+            connect_args["prepare_threshold"] = 1
+        engine = _ENGINES[db_url] = create_engine(
+            db_url, pool_size=4, pool_pre_ping=True, connect_args=connect_args
+        )
+    return engine
+
+
+def _count_distinct(expr: str) -> str:
+    if _USE_HLL:
+        return f"hll_cardinality(hll_add_agg(hll_hash_text(({expr})::text)))::bigint"
+    return f"COUNT(DISTINCT {expr})"
+
+# Target dtypes per feature view, matching the Field dtypes in
+# feature_definitions.py. Casting once up front means Feast's row-by-row
+# serializer finds every cell already in the expected type and skips its
+# per-cell coercion branches.
+_PUSH_DTYPES: Dict[str, Dict[str, str]] = {
+    "user_listening_stats": {
+        "play_count_7d": "int64",
+        "like_count_7d": "int64",
+        "skip_count_7d": "int64",
+        "unique_tracks_7d": "int64",
+        "unique_artists_7d": "int64",
+        "like_rate_7d": "float32",
+        "skip_rate_7d": "float32",
+    },
+    "user_audio_preferences": {
+        "avg_energy": "float32",
+        "avg_valence": "float32",
+        "avg_danceability": "float32",
+        "avg_acousticness": "float32",
+        "avg_instrumentalness": "float32",
+        "avg_tempo": "float32",
+    },
+    "track_audio_features": {
+        "energy": "float32",
+        "valence": "float32",
+        "danceability": "float32",
+        "acousticness": "float32",
+        "instrumentalness": "float32",
+        "tempo": "float32",
+        "loudness": "float32",
+        "speechiness": "float32",
+    },
+    "track_popularity": {
+        "play_count_7d": "int64",
+        "like_count_7d": "int64",
+        "skip_count_7d": "int64",
+        "unique_users_7d": "int64",
+        "popularity_score": "float32",
+    },
+}
+
+
+@functools.lru_cache(maxsize=4)
+def _get_store(repo_path: str) -> FeatureStore:
+    """One FeatureStore handle per repo path per process.
+
+    Constructing FeatureStore re-parses feature_store.yaml, reloads the
+    registry proto and reopens Redis connections — wasted work when four
+    phases (or repeated CLI invocations in one process) share a repo.
+    """
+    return FeatureStore(repo_path=repo_path)
+
+
+def _precast_for_push(df: pd.DataFrame, feature_view_name: str, entity_column: str) -> pd.DataFrame:
+    """Cast columns to the exact dtypes Feast expects before store.push()."""
+    dtypes = {
+        col: dtype
+        for col, dtype in _PUSH_DTYPES.get(feature_view_name, {}).items()
+        if col in df.columns
+    }
+    if dtypes:
+        df = df.astype(dtypes)
+    if entity_column in df.columns and df[entity_column].dtype == object:
+        df[entity_column] = df[entity_column].astype(str)
+    if "event_timestamp" in df.columns and not pd.api.types.is_datetime64_any_dtype(
+        df["event_timestamp"]
+    ):
+        df["event_timestamp"] = pd.to_datetime(df["event_timestamp"], unit="s")
+    return df
+
+
+def _read_sql_streamed(engine, sql: str, params: Dict[str, Any]) -> pd.DataFrame:
+    """Parameterized, server-side-cursor read assembled from chunks.
+
+    dtype_backend="pyarrow" lands rows in Arrow chunked arrays instead of
+    NumPy object/float64 columns — cheaper to build and roughly half the
+    memory for these mostly-numeric extracts (pandas >= 2.0).
+    """
+    chunks = list(
+        pd.read_sql_query(
+            text(sql),
+            engine.execution_options(stream_results=True),
+            params=params,
+            chunksize=_READ_CHUNK_ROWS,
+            dtype_backend="pyarrow",
+        )
+    )
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
 
 
 def extract_user_listening_stats(db_url: str, days: int = 7) -> pd.DataFrame:
     """استخراج إحصائيات الاستماع للمستخدمين"""
-    engine = create_engine(db_url)
+    engine = _engine(db_url)
 
     cutoff = datetime.now() - timedelta(days=days)
 
-    query = f"""
-    WITH user_interactions AS (
-        SELECT
-            external_user_id,
-            event_type,
-            COUNT(*) as event_count,
-            COUNT(DISTINCT track_id) as unique_tracks,
-            COUNT(DISTINCT (
-                SELECT artist FROM tracks WHERE id = interactions.track_id
-            )) as unique_artists
-        FROM interactions
-        WHERE created_at >= '{cutoff.isoformat()}'
-        GROUP BY external_user_id, event_type
-    )
+    # Reads the interactions_daily rollup (migration 006) instead of raw
+    # events: summing 7 pre-counted days per (user, track, event_type) is
+    # orders of magnitude less data than re-scanning the window. FILTER
+    # clauses do the per-event-type split in one GROUP BY.
+    query = """
     SELECT
-        external_user_id,
-        COALESCE(SUM(CASE WHEN event_type = 'PLAY' THEN event_count ELSE 0 END), 0) as play_count_7d,
-        COALESCE(SUM(CASE WHEN event_type = 'LIKE' THEN event_count ELSE 0 END), 0) as like_count_7d,
-        COALESCE(SUM(CASE WHEN event_type = 'SKIP' THEN event_count ELSE 0 END), 0) as skip_count_7d,
-        MAX(unique_tracks) as unique_tracks_7d,
-        MAX(unique_artists) as unique_artists_7d,
+        d.external_user_id,
+        COALESCE(SUM(d.cnt) FILTER (WHERE d.event_type = 'PLAY'), 0) as play_count_7d,
+        COALESCE(SUM(d.cnt) FILTER (WHERE d.event_type = 'LIKE'), 0) as like_count_7d,
+        COALESCE(SUM(d.cnt) FILTER (WHERE d.event_type = 'SKIP'), 0) as skip_count_7d,
+        {unique_tracks} as unique_tracks_7d,
+        {unique_artists} as unique_artists_7d,
         CASE
-            WHEN SUM(CASE WHEN event_type = 'PLAY' THEN event_count ELSE 0 END) > 0
-            THEN CAST(SUM(CASE WHEN event_type = 'LIKE' THEN event_count ELSE 0 END) AS FLOAT) /
-                 SUM(CASE WHEN event_type = 'PLAY' THEN event_count ELSE 0 END)
+            WHEN SUM(d.cnt) FILTER (WHERE d.event_type = 'PLAY') > 0
+            THEN CAST(SUM(d.cnt) FILTER (WHERE d.event_type = 'LIKE') AS FLOAT) /
+                 SUM(d.cnt) FILTER (WHERE d.event_type = 'PLAY')
             ELSE 0
         END as like_rate_7d,
         CASE
-            WHEN SUM(CASE WHEN event_type = 'PLAY' THEN event_count ELSE 0 END) > 0
-            THEN CAST(SUM(CASE WHEN event_type = 'SKIP' THEN event_count ELSE 0 END) AS FLOAT) /
-                 SUM(CASE WHEN event_type = 'PLAY' THEN event_count ELSE 0 END)
+            WHEN SUM(d.cnt) FILTER (WHERE d.event_type = 'PLAY') > 0
+            THEN CAST(SUM(d.cnt) FILTER (WHERE d.event_type = 'SKIP') AS FLOAT) /
+                 SUM(d.cnt) FILTER (WHERE d.event_type = 'PLAY')
             ELSE 0
-        END as skip_rate_7d,
-        EXTRACT(EPOCH FROM NOW()) as event_timestamp
-    FROM user_interactions
-    GROUP BY external_user_id
-    """
+        END as skip_rate_7d
+    FROM interactions_daily d
+    JOIN tracks t ON t.id = d.track_id
+    WHERE d.day >= date_trunc('day', CAST(:cutoff AS timestamptz))
+    GROUP BY d.external_user_id
+    """.format(
+        unique_tracks=_count_distinct("d.track_id"),
+        unique_artists=_count_distinct("t.artist"),
+    )
+
+    df = _read_sql_streamed(engine, query, {"cutoff": cutoff})
 
-    df = pd.read_sql(query, engine)
+    if df.empty:
+        return df
 
-    # Ensure timestamp is integer (Unix timestamp)
-    df['event_timestamp'] = df['event_timestamp'].astype(int)
+    # One client-side stamp beats evaluating NOW() per output row in Postgres
+    df['event_timestamp'] = pd.Timestamp.now('UTC')
 
     return df
 
 
 def extract_user_audio_preferences(db_url: str, days: int = 30) -> pd.DataFrame:
     """استخراج تفضيلات الصوت للمستخدمين (متوسط audio features من الأغاني المفضلة)"""
-    engine = create_engine(db_url)
+    engine = _engine(db_url)
 
     cutoff = datetime.now() - timedelta(days=days)
 
-    query = f"""
+    # Audio attributes are stored generated columns on tracks (migration 004),
+    # so the aggregation reads plain floats instead of parsing JSONB per row.
+    query = """
     SELECT
         i.external_user_id,
-        AVG((t.audio_features->>'energy')::float) as avg_energy,
-        AVG((t.audio_features->>'valence')::float) as avg_valence,
-        AVG((t.audio_features->>'danceability')::float) as avg_danceability,
-        AVG((t.audio_features->>'acousticness')::float) as avg_acousticness,
-        AVG((t.audio_features->>'instrumentalness')::float) as avg_instrumentalness,
-        AVG((t.audio_features->>'tempo')::float) as avg_tempo,
-        EXTRACT(EPOCH FROM NOW()) as event_timestamp
+        COALESCE(AVG(t.energy), 0.5) as avg_energy,
+        COALESCE(AVG(t.valence), 0.5) as avg_valence,
+        COALESCE(AVG(t.danceability), 0.5) as avg_danceability,
+        COALESCE(AVG(t.acousticness), 0.5) as avg_acousticness,
+        COALESCE(AVG(t.instrumentalness), 0.5) as avg_instrumentalness,
+        COALESCE(AVG(t.tempo), 120.0) as avg_tempo
     FROM interactions i
     JOIN tracks t ON i.track_id = t.id
     WHERE i.event_type IN ('PLAY', 'LIKE')
-      AND i.created_at >= '{cutoff.isoformat()}'
+      AND i.created_at >= :cutoff
       AND t.audio_features IS NOT NULL
     GROUP BY i.external_user_id
     HAVING COUNT(*) >= 5
     """
 
-    df = pd.read_sql(query, engine)
+    df = _read_sql_streamed(engine, query, {"cutoff": cutoff})
 
-    # Fill NaN with defaults
-    df = df.fillna({
-        'avg_energy': 0.5,
-        'avg_valence': 0.5,
-        'avg_danceability': 0.5,
-        'avg_acousticness': 0.5,
-        'avg_instrumentalness': 0.5,
-        'avg_tempo': 120.0,
-    })
+    if df.empty:
+        return df
 
-    df['event_timestamp'] = df['event_timestamp'].astype(int)
+    df['event_timestamp'] = pd.Timestamp.now('UTC')
 
     return df
 
 
+def _copy_csv_to_df(engine, select_sql: str, names: List[str]) -> pd.DataFrame:
+    """Dump a SELECT through COPY ... TO STDOUT straight into pandas.
+
+    Bulk extraction via the DBAPI fetch path allocates a Python object per
+    cell; COPY streams CSV bytes that pd.read_csv parses into columnar
+    buffers directly, which is both faster and ~3x lighter on peak memory
+    for full-table dumps.
+    """
+    buf = io.BytesIO()
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        try:
+            cur.copy_expert(f"COPY ({select_sql}) TO STDOUT WITH CSV", buf)
+        finally:
+            cur.close()
+    finally:
+        raw.close()
+
+    if buf.tell() == 0:
+        # Empty table: COPY writes zero bytes and pd.read_csv would raise
+        # EmptyDataError instead of handing back an empty frame
+        return pd.DataFrame(columns=names)
+
+    buf.seek(0)
+    return pd.read_csv(buf, names=names, header=None)
+
+
 def extract_track_audio_features(db_url: str) -> pd.DataFrame:
     """استخراج audio features للأغاني"""
-    engine = create_engine(db_url)
+    engine = _engine(db_url)
 
+    # Generated columns (migration 004): direct column scan, no JSONB
+    # parsing. Defaults are applied with COALESCE where the data lives,
+    # so no client-side fillna pass is needed.
     query = """
     SELECT
         id as track_id,
-        (audio_features->>'energy')::float as energy,
-        (audio_features->>'valence')::float as valence,
-        (audio_features->>'danceability')::float as danceability,
-        (audio_features->>'acousticness')::float as acousticness,
-        (audio_features->>'instrumentalness')::float as instrumentalness,
-        (audio_features->>'tempo')::float as tempo,
-        (audio_features->>'loudness')::float as loudness,
-        (audio_features->>'speechiness')::float as speechiness,
-        EXTRACT(EPOCH FROM NOW()) as event_timestamp
+        COALESCE(energy, 0.5) as energy,
+        COALESCE(valence, 0.5) as valence,
+        COALESCE(danceability, 0.5) as danceability,
+        COALESCE(acousticness, 0.5) as acousticness,
+        COALESCE(instrumentalness, 0.5) as instrumentalness,
+        COALESCE(tempo, 120.0) as tempo,
+        COALESCE(loudness, -10.0) as loudness,
+        COALESCE(speechiness, 0.1) as speechiness
     FROM tracks
     WHERE audio_features IS NOT NULL
     """
 
-    df = pd.read_sql(query, engine)
+    df = _copy_csv_to_df(
+        engine,
+        query,
+        names=[
+            'track_id', 'energy', 'valence', 'danceability', 'acousticness',
+            'instrumentalness', 'tempo', 'loudness', 'speechiness',
+        ],
+    )
 
-    df = df.fillna({
-        'energy': 0.5,
-        'valence': 0.5,
-        'danceability': 0.5,
-        'acousticness': 0.5,
-        'instrumentalness': 0.5,
-        'tempo': 120.0,
-        'loudness': -10.0,
-        'speechiness': 0.1,
-    })
+    if df.empty:
+        return df
 
-    df['event_timestamp'] = df['event_timestamp'].astype(int)
+    df['event_timestamp'] = pd.Timestamp.now('UTC')
 
     return df
 
 
 def extract_track_popularity(db_url: str, days: int = 7) -> pd.DataFrame:
     """استخراج مقاييس شعبية الأغاني"""
-    engine = create_engine(db_url)
+    engine = _engine(db_url)
 
     cutoff = datetime.now() - timedelta(days=days)
 
-    query = f"""
-    WITH track_stats AS (
-        SELECT
-            track_id,
-            event_type,
-            COUNT(*) as event_count,
-            COUNT(DISTINCT external_user_id) as unique_users
-        FROM interactions
-        WHERE created_at >= '{cutoff.isoformat()}'
-        GROUP BY track_id, event_type
-    )
+    # Aggregates the interactions_daily rollup (see extract_user_listening_stats)
+    query = """
     SELECT
         track_id,
-        COALESCE(SUM(CASE WHEN event_type = 'PLAY' THEN event_count ELSE 0 END), 0) as play_count_7d,
-        COALESCE(SUM(CASE WHEN event_type = 'LIKE' THEN event_count ELSE 0 END), 0) as like_count_7d,
-        COALESCE(SUM(CASE WHEN event_type = 'SKIP' THEN event_count ELSE 0 END), 0) as skip_count_7d,
-        MAX(unique_users) as unique_users_7d,
-        CASE
-            WHEN SUM(event_count) > 0
-            THEN LOG(1 + SUM(event_count)) / 10.0
-            ELSE 0
-        END as popularity_score,
-        EXTRACT(EPOCH FROM NOW()) as event_timestamp
-    FROM track_stats
+        COALESCE(SUM(cnt) FILTER (WHERE event_type = 'PLAY'), 0) as play_count_7d,
+        COALESCE(SUM(cnt) FILTER (WHERE event_type = 'LIKE'), 0) as like_count_7d,
+        COALESCE(SUM(cnt) FILTER (WHERE event_type = 'SKIP'), 0) as skip_count_7d,
+        {unique_users} as unique_users_7d,
+        LOG(1 + SUM(cnt)) / 10.0 as popularity_score
+    FROM interactions_daily
+    WHERE day >= date_trunc('day', CAST(:cutoff AS timestamptz))
     GROUP BY track_id
-    """
+    """.format(unique_users=_count_distinct("external_user_id"))
+
+    df = _read_sql_streamed(engine, query, {"cutoff": cutoff})
 
-    df = pd.read_sql(query, engine)
+    if df.empty:
+        return df
 
     df['popularity_score'] = df['popularity_score'].clip(0, 1)
-    df['event_timestamp'] = df['event_timestamp'].astype(int)
+    df['event_timestamp'] = pd.Timestamp.now('UTC')
 
     return df
 
 
+def _maybe_write_columnar(feature_view_name: str, df: pd.DataFrame, entity_column: str):
+    """Mirror homogeneous float32 views as SoA columns (COLUMNAR_SNAPSHOT=1).
+
+    Batch consumers then fetch whole columns with one MGET instead of one
+    proto per entity; Feast stays the source of truth for point lookups.
+    """
+    if os.getenv("COLUMNAR_SNAPSHOT") != "1":
+        return
+    if feature_view_name not in COLUMNAR_VIEWS:
+        return
+    try:
+        import redis
+
+        client = redis.from_url(os.getenv("REDIS_URL", "redis://redis:6379/0"))
+        written = write_columnar_snapshot(client, feature_view_name, df, entity_column)
+        print(f"📦 Columnar snapshot: {written} columns for {feature_view_name}")
+    except Exception as e:
+        print(f"⚠️  Columnar snapshot failed for {feature_view_name}: {e}")
+
+
 def materialize_to_feast(
     feast_repo_path: str,
     feature_view_name: str,
     df: pd.DataFrame,
-    entity_column: str
+    entity_column: str,
+    store: "FeatureStore" = None,
 ):
     """نقل البيانات إلى Feast Feature Store"""
 
-    store = FeatureStore(repo_path=feast_repo_path)
+    if store is None:
+        store = _get_store(feast_repo_path)
 
     print(f"📊 Materializing {len(df)} rows to feature view: {feature_view_name}")
     print(f"   Entity column: {entity_column}")
     print(f"   Columns: {list(df.columns)}")
 
-    # Push to online store (Redis)
-    store.push(
-        feature_view_name=feature_view_name,
-        df=df,
-        to=PushMode.ONLINE
-    )
+    df = _precast_for_push(df, feature_view_name, entity_column)
+
+    # Push to online store (Redis) in chunks rather than one huge blocking
+    # call: concurrent pushes let Feast's Redis pipeline flushes overlap.
+    # Chunk via iloc: np.array_split on a DataFrame needs swapaxes, which
+    # pandas 3 removed.
+    chunks = [
+        df.iloc[i:i + _PUSH_CHUNK_ROWS]
+        for i in range(0, len(df), _PUSH_CHUNK_ROWS)
+    ]
+    if len(chunks) == 1:
+        store.push(feature_view_name=feature_view_name, df=df, to=PushMode.ONLINE)
+    else:
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [
+                pool.submit(
+                    store.push,
+                    feature_view_name=feature_view_name,
+                    df=chunk,
+                    to=PushMode.ONLINE,
+                )
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+    _maybe_write_columnar(feature_view_name, df, entity_column)
 
     print(f"✅ Successfully materialized to {feature_view_name}")
 
 
+def _materialize_phase(
+    db_url: str,
+    feast_repo_path: str,
+    store: "FeatureStore",
+    name: str,
+    extract_fn,
+    entity_column: str,
+):
+    """مرحلة واحدة: استخراج ثم دفع إلى Feast (تُنفَّذ داخل ThreadPool)"""
+    df = extract_fn(db_url)
+    if df.empty:
+        print(f"⚠️  [{name}] No data found")
+        return
+    materialize_to_feast(feast_repo_path, name, df, entity_column, store=store)
+
+
 def materialize_all(db_url: str, feast_repo_path: str):
     """تنفيذ كل عمليات Materialization"""
 
     print("🚀 Starting full feature materialization...")
 
-    # 1. User listening stats
-    print("\n[1/4] User Listening Stats")
-    try:
-        df = extract_user_listening_stats(db_url)
-        if not df.empty:
-            materialize_to_feast(feast_repo_path, "user_listening_stats", df, "external_user_id")
-        else:
-            print("⚠️  No data found")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-
-    # 2. User audio preferences
-    print("\n[2/4] User Audio Preferences")
-    try:
-        df = extract_user_audio_preferences(db_url)
-        if not df.empty:
-            materialize_to_feast(feast_repo_path, "user_audio_preferences", df, "external_user_id")
-        else:
-            print("⚠️  No data found")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-
-    # 3. Track audio features
-    print("\n[3/4] Track Audio Features")
-    try:
-        df = extract_track_audio_features(db_url)
-        if not df.empty:
-            materialize_to_feast(feast_repo_path, "track_audio_features", df, "track_id")
-        else:
-            print("⚠️  No data found")
-    except Exception as e:
-        print(f"❌ Error: {e}")
-
-    # 4. Track popularity
-    print("\n[4/4] Track Popularity")
-    try:
-        df = extract_track_popularity(db_url)
-        if not df.empty:
-            materialize_to_feast(feast_repo_path, "track_popularity", df, "track_id")
-        else:
-            print("⚠️  No data found")
-    except Exception as e:
-        print(f"❌ Error: {e}")
+    # The four phases are independent (each opens its own engine) and
+    # IO-bound on Postgres then Redis, so they run concurrently; wall-clock
+    # approaches the slowest phase instead of the sum of all four.
+    store = _get_store(feast_repo_path)
+
+    phases = [
+        ("user_listening_stats", extract_user_listening_stats, "external_user_id"),
+        ("user_audio_preferences", extract_user_audio_preferences, "external_user_id"),
+        ("track_audio_features", extract_track_audio_features, "track_id"),
+        ("track_popularity", extract_track_popularity, "track_id"),
+    ]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = {
+            pool.submit(
+                _materialize_phase, db_url, feast_repo_path, store, name, fn, entity_col
+            ): name
+            for name, fn, entity_col in phases
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ [{name}] Error: {e}")
 
     print("\n✅ Feature materialization complete!")
 
@@ -316,15 +521,5 @@ def main():
         sys.exit(1)
 
 
-# Import PushMode from feast
-try:
-    from feast.data_source import PushMode
-except ImportError:
-    # Fallback for older versions
-    class PushMode:
-        ONLINE = "online"
-        OFFLINE = "offline"
-
-
 if __name__ == '__main__':
     main()
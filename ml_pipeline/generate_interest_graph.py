@@ -11,16 +11,16 @@ Usage:
 """
 
 import argparse
+import asyncio
+import hashlib
 import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
-import pandas as pd
-from sqlalchemy import create_engine, text
-
 
 # LLM Providers
 def call_anthropic_llm(prompt: str, api_key: str, model: str = "claude-3-5-sonnet-20241022") -> str:
@@ -58,6 +58,106 @@ def call_openai_llm(prompt: str, api_key: str, model: str = "gpt-4o") -> str:
         return ""
 
 
+# Shared asyncpg pool: one set of connections for the whole run instead of a
+# fresh SQLAlchemy engine (and its handshakes) per user. Created lazily inside
+# the running event loop; the pool is bound to that loop, so it is recreated
+# whenever a new asyncio.run() starts a different one.
+_POOL = None
+_POOL_LOOP = None
+
+
+def _asyncpg_dsn(db_url: str) -> str:
+    """asyncpg takes a plain postgres:// DSN, not a SQLAlchemy driver URL"""
+    for prefix in ('postgresql+psycopg2://', 'postgresql+psycopg://', 'postgres+psycopg2://'):
+        if db_url.startswith(prefix):
+            return 'postgresql://' + db_url[len(prefix):]
+    return db_url
+
+
+async def get_pool(db_url: str):
+    global _POOL, _POOL_LOOP
+    loop = asyncio.get_running_loop()
+    if _POOL is None or _POOL_LOOP is not loop:
+        import asyncpg
+
+        _POOL = await asyncpg.create_pool(
+            _asyncpg_dsn(db_url),
+            min_size=10,
+            max_size=50,
+            max_inactive_connection_lifetime=300,
+        )
+        _POOL_LOOP = loop
+    return _POOL
+
+
+# Retry policy for the async callers: rate limits (429) and server errors
+# (5xx) back off exponentially; anything else fails fast.
+_LLM_MAX_RETRIES = 5
+_LLM_BACKOFF_BASE = 1.0
+
+
+def _retryable_status(e: Exception) -> bool:
+    status = getattr(e, 'status_code', None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+async def call_anthropic_llm_async(prompt: str, api_key: str, model: str = "claude-3-5-sonnet-20241022") -> str:
+    """استدعاء Claude API (async, مع exponential backoff)"""
+    try:
+        from anthropic import AsyncAnthropic
+    except ImportError as e:
+        print(f"❌ Anthropic import error: {e}")
+        return ""
+
+    client = AsyncAnthropic(api_key=api_key)
+    for attempt in range(_LLM_MAX_RETRIES):
+        try:
+            message = await client.messages.create(
+                model=model,
+                max_tokens=2048,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            return message.content[0].text
+        except Exception as e:
+            if _retryable_status(e) and attempt < _LLM_MAX_RETRIES - 1:
+                delay = _LLM_BACKOFF_BASE * (2 ** attempt)
+                print(f"⏳ Anthropic {getattr(e, 'status_code', '?')}, retrying in {delay:.0f}s...")
+                await asyncio.sleep(delay)
+                continue
+            print(f"❌ Anthropic API error: {e}")
+            return ""
+    return ""
+
+
+async def call_openai_llm_async(prompt: str, api_key: str, model: str = "gpt-4o") -> str:
+    """استدعاء OpenAI API (async, مع exponential backoff)"""
+    try:
+        from openai import AsyncOpenAI
+    except ImportError as e:
+        print(f"❌ OpenAI import error: {e}")
+        return ""
+
+    client = AsyncOpenAI(api_key=api_key)
+    for attempt in range(_LLM_MAX_RETRIES):
+        try:
+            response = await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.3,
+                max_tokens=2048
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            if _retryable_status(e) and attempt < _LLM_MAX_RETRIES - 1:
+                delay = _LLM_BACKOFF_BASE * (2 ** attempt)
+                print(f"⏳ OpenAI {getattr(e, 'status_code', '?')}, retrying in {delay:.0f}s...")
+                await asyncio.sleep(delay)
+                continue
+            print(f"❌ OpenAI API error: {e}")
+            return ""
+    return ""
+
+
 @dataclass
 class UserInteractionSummary:
     """ملخص تفاعلات المستخدم"""
@@ -77,121 +177,159 @@ class UserInteractionSummary:
     avg_danceability: float
 
 
-def fetch_user_summary(db_url: str, user_id: str, days: int = 90) -> Optional[UserInteractionSummary]:
+# Max pool connections a single user's summary queries may occupy at once
+_SUMMARY_QUERY_CONCURRENCY = 5
+
+# Summary queries: Postgres computes the scalars and top-10 lists so only a
+# handful of rows cross the wire, instead of shipping the raw 90-day window
+# to be re-aggregated in Python.
+_SQL_USER_STATS = """
+SELECT
+    COUNT(*) as total_events,
+    COUNT(*) FILTER (WHERE i.event_type = 'PLAY') as total_plays,
+    COUNT(*) FILTER (WHERE i.event_type = 'LIKE') as total_likes,
+    COUNT(*) FILTER (WHERE i.event_type = 'SKIP') as total_skips,
+    COUNT(DISTINCT i.track_id) as unique_tracks,
+    COUNT(DISTINCT t.artist) as unique_artists,
+    COUNT(DISTINCT t.genre) as unique_genres,
+    AVG(t.energy) as avg_energy,
+    AVG(t.valence) as avg_valence,
+    AVG(t.danceability) as avg_danceability
+FROM interactions i
+LEFT JOIN tracks t ON i.track_id = t.id
+WHERE i.external_user_id = $1
+  AND i.created_at >= $2
+"""
+
+_SQL_TOP_ARTISTS = """
+SELECT t.artist, COUNT(*) as count
+FROM interactions i
+JOIN tracks t ON i.track_id = t.id
+WHERE i.external_user_id = $1
+  AND i.created_at >= $2
+  AND t.artist IS NOT NULL
+GROUP BY t.artist
+ORDER BY count DESC
+LIMIT 10
+"""
+
+_SQL_TOP_GENRES = """
+SELECT t.genre, COUNT(*) as count
+FROM interactions i
+JOIN tracks t ON i.track_id = t.id
+WHERE i.external_user_id = $1
+  AND i.created_at >= $2
+  AND t.genre IS NOT NULL
+GROUP BY t.genre
+ORDER BY count DESC
+LIMIT 10
+"""
+
+_SQL_LISTENING_HOURS = """
+SELECT EXTRACT(HOUR FROM created_at)::int as hour, COUNT(*) as count
+FROM interactions
+WHERE external_user_id = $1
+  AND created_at >= $2
+GROUP BY 1
+"""
+
+_SQL_RECENT_TRACKS = """
+SELECT i.track_id::text as track_id, t.title, t.artist, t.genre
+FROM interactions i
+LEFT JOIN tracks t ON i.track_id = t.id
+WHERE i.external_user_id = $1
+  AND i.created_at >= $2
+ORDER BY i.created_at DESC
+LIMIT 20
+"""
+
+
+async def fetch_user_summary(db_url: str, user_id: str, days: int = 90) -> Optional[UserInteractionSummary]:
     """استخراج ملخص شامل لتفاعلات المستخدم"""
-    engine = create_engine(db_url)
+    pool = await get_pool(db_url)
 
     # Period filter
     cutoff_date = datetime.now() - timedelta(days=days)
 
-    # Main interactions
-    interactions_query = """
-    SELECT
-        i.event_type,
-        i.track_id,
-        i.created_at,
-        t.title,
-        t.artist,
-        t.genre,
-        t.audio_features,
-        EXTRACT(HOUR FROM i.created_at) as hour
-    FROM interactions i
-    LEFT JOIN tracks t ON i.track_id = t.id
-    WHERE i.external_user_id = :user_id
-      AND i.created_at >= :cutoff
-    ORDER BY i.created_at DESC
-    """
-
-    df = pd.read_sql(
-        interactions_query,
-        engine,
-        params={'user_id': user_id, 'cutoff': cutoff_date}
+    # Cap how many pool connections one user's summary may hold at once, so
+    # a generate_all_users run can't have a single user starve the pool
+    sem = asyncio.Semaphore(_SUMMARY_QUERY_CONCURRENCY)
+
+    async def _fetch(query: str):
+        async with sem:
+            async with pool.acquire() as conn:
+                return await conn.fetch(query, user_id, cutoff_date)
+
+    async def _fetchrow(query: str):
+        async with sem:
+            async with pool.acquire() as conn:
+                return await conn.fetchrow(query, user_id, cutoff_date)
+
+    # The five small queries are independent; run them concurrently on the pool
+    stats, artists, genres, hours, recent = await asyncio.gather(
+        _fetchrow(_SQL_USER_STATS),
+        _fetch(_SQL_TOP_ARTISTS),
+        _fetch(_SQL_TOP_GENRES),
+        _fetch(_SQL_LISTENING_HOURS),
+        _fetch(_SQL_RECENT_TRACKS),
     )
 
-    if df.empty:
+    if not stats or stats['total_events'] == 0:
         return None
 
-    # Aggregate stats
-    total_plays = len(df[df['event_type'] == 'PLAY'])
-    total_likes = len(df[df['event_type'] == 'LIKE'])
-    total_skips = len(df[df['event_type'] == 'SKIP'])
-
-    unique_tracks = df['track_id'].nunique()
-    unique_artists = df['artist'].nunique()
-    unique_genres = df['genre'].nunique()
-
-    # Top artists
-    top_artists = (
-        df[df['artist'].notna()]
-        .groupby('artist')
-        .size()
-        .sort_values(ascending=False)
-        .head(10)
-        .to_dict()
-    )
-    top_artists_list = [{'artist': k, 'count': v} for k, v in top_artists.items()]
-
-    # Top genres
-    top_genres = (
-        df[df['genre'].notna()]
-        .groupby('genre')
-        .size()
-        .sort_values(ascending=False)
-        .head(10)
-        .to_dict()
+    return UserInteractionSummary(
+        user_id=user_id,
+        total_plays=stats['total_plays'],
+        total_likes=stats['total_likes'],
+        total_skips=stats['total_skips'],
+        unique_tracks=stats['unique_tracks'],
+        unique_artists=stats['unique_artists'],
+        unique_genres=stats['unique_genres'],
+        top_artists=[{'artist': r['artist'], 'count': r['count']} for r in artists],
+        top_genres=[{'genre': r['genre'], 'count': r['count']} for r in genres],
+        recent_tracks=[dict(r) for r in recent],
+        listening_times={r['hour']: r['count'] for r in hours},
+        avg_energy=stats['avg_energy'] or 0.0,
+        avg_valence=stats['avg_valence'] or 0.0,
+        avg_danceability=stats['avg_danceability'] or 0.0
     )
-    top_genres_list = [{'genre': k, 'count': v} for k, v in top_genres.items()]
-
-    # Recent tracks (last 20)
-    recent_tracks = df.head(20)[['track_id', 'title', 'artist', 'genre']].to_dict('records')
-
-    # Listening times
-    listening_times = df.groupby('hour').size().to_dict()
-
-    # Audio features averages
-    audio_features = []
-    for af_json in df['audio_features'].dropna():
-        if isinstance(af_json, str):
-            try:
-                af = json.loads(af_json)
-                audio_features.append(af)
-            except:
-                continue
-        elif isinstance(af_json, dict):
-            audio_features.append(af_json)
 
-    avg_energy = 0.0
-    avg_valence = 0.0
-    avg_danceability = 0.0
 
-    if audio_features:
-        avg_energy = sum(af.get('energy', 0) for af in audio_features) / len(audio_features)
-        avg_valence = sum(af.get('valence', 0) for af in audio_features) / len(audio_features)
-        avg_danceability = sum(af.get('danceability', 0) for af in audio_features) / len(audio_features)
+# Static instruction header kept first and byte-identical across users so
+# provider-side prompt-prefix caching (Anthropic cache_control, OpenAI
+# automatic prefix cache) applies to it; per-user data follows.
+_PROMPT_HEADER = """You are a music taste analyst. Analyze the user's music listening behavior below and generate a comprehensive Interest Graph with the following structure (return ONLY valid JSON):
 
-    return UserInteractionSummary(
-        user_id=user_id,
-        total_plays=total_plays,
-        total_likes=total_likes,
-        total_skips=total_skips,
-        unique_tracks=unique_tracks,
-        unique_artists=unique_artists,
-        unique_genres=unique_genres,
-        top_artists=top_artists_list,
-        top_genres=top_genres_list,
-        recent_tracks=recent_tracks,
-        listening_times=listening_times,
-        avg_energy=avg_energy,
-        avg_valence=avg_valence,
-        avg_danceability=avg_danceability
-    )
+{
+  "topArtists": {"artist_name": weight_0_to_1, ...},
+  "topGenres": {"genre_name": weight_0_to_1, ...},
+  "themes": ["theme1", "theme2", ...],
+  "moods": ["mood1", "mood2", ...],
+  "listeningPatterns": {
+    "preferredTimes": ["morning", "evening", ...],
+    "averageEnergy": float,
+    "averageValence": float,
+    "averageDanceability": float
+  },
+  "artistRelations": [
+    {"from": "artist1", "to": "artist2", "reason": "similar_genre"},
+    ...
+  ],
+  "insights": [
+    "User prefers energetic rock in the evening",
+    "Strong affinity for indie folk artists",
+    ...
+  ]
+}
+
+Return ONLY the JSON object, no additional text.
+"""
 
 
 def build_llm_prompt(summary: UserInteractionSummary) -> str:
     """بناء Prompt لـ LLM"""
 
-    prompt = f"""You are a music taste analyst. Analyze the following user's music listening behavior and generate a structured Interest Graph.
-
+    prompt = _PROMPT_HEADER + f"""
 User Listening Summary:
 - Total Plays: {summary.total_plays}
 - Total Likes: {summary.total_likes}
@@ -216,35 +354,42 @@ Average Audio Features:
 - Energy: {summary.avg_energy:.2f}
 - Valence: {summary.avg_valence:.2f}
 - Danceability: {summary.avg_danceability:.2f}
+"""
 
-Based on this data, generate a comprehensive Interest Graph with the following structure (return ONLY valid JSON):
+    return prompt
 
-{{
-  "topArtists": {{"artist_name": weight_0_to_1, ...}},
-  "topGenres": {{"genre_name": weight_0_to_1, ...}},
-  "themes": ["theme1", "theme2", ...],
-  "moods": ["mood1", "mood2", ...],
-  "listeningPatterns": {{
-    "preferredTimes": ["morning", "evening", ...],
-    "averageEnergy": float,
-    "averageValence": float,
-    "averageDanceability": float
-  }},
-  "artistRelations": [
-    {{"from": "artist1", "to": "artist2", "reason": "similar_genre"}},
-    ...
-  ],
-  "insights": [
-    "User prefers energetic rock in the evening",
-    "Strong affinity for indie folk artists",
-    ...
-  ]
-}}
 
-Return ONLY the JSON object, no additional text.
-"""
+async def _get_cached_llm_response(db_url: str, key: str) -> Optional[str]:
+    """Lookup in the content-addressed llm_cache table (migration 008)"""
+    try:
+        pool = await get_pool(db_url)
+        row = await pool.fetchrow("SELECT response FROM llm_cache WHERE key = $1", key)
+        return row['response'] if row else None
+    except Exception as e:
+        print(f"⚠️  LLM cache lookup failed: {e}")
+        return None
 
-    return prompt
+
+async def _store_cached_llm_response(db_url: str, key: str, response: str):
+    try:
+        pool = await get_pool(db_url)
+        await pool.execute(
+            "INSERT INTO llm_cache (key, response) VALUES ($1, $2) ON CONFLICT (key) DO NOTHING",
+            key, response
+        )
+    except Exception as e:
+        print(f"⚠️  LLM cache store failed: {e}")
+
+
+async def _delete_cached_llm_response(db_url: str, key: str):
+    try:
+        pool = await get_pool(db_url)
+        await pool.execute("DELETE FROM llm_cache WHERE key = $1", key)
+    except Exception as e:
+        print(f"⚠️  LLM cache delete failed: {e}")
+
+
+_JSON_DECODER = json.JSONDecoder()
 
 
 def parse_llm_response(response: str) -> Optional[Dict[str, Any]]:
@@ -252,62 +397,50 @@ def parse_llm_response(response: str) -> Optional[Dict[str, Any]]:
     try:
         # Try direct parse
         return json.loads(response)
-    except:
-        # Try to extract JSON from markdown code blocks
-        import re
-        json_match = re.search(r'```json\s*(.*?)\s*```', response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(1))
-            except:
-                pass
-
-        # Try to find any JSON object
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(0))
-            except:
-                pass
+    except ValueError:
+        pass
+
+    # Forward scan for the first parseable object: raw_decode (C-implemented)
+    # stops at the first complete value, so this is O(n) even on responses
+    # full of stray braces — unlike the old DOTALL regexes, which backtrack.
+    pos = response.find('{')
+    while pos != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(response, pos)
+            if isinstance(obj, dict):
+                return obj
+        except ValueError:
+            pass
+        pos = response.find('{', pos + 1)
 
     return None
 
 
-def save_interest_graph(db_url: str, user_id: str, graph: Dict[str, Any]):
-    """حفظ Interest Graph في قاعدة البيانات"""
-    engine = create_engine(db_url)
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        return json.dumps(obj)
 
-    with engine.connect() as conn:
-        # Check if exists
-        result = conn.execute(
-            text("SELECT id FROM user_interest_graph WHERE external_user_id = :uid"),
-            {'uid': user_id}
-        )
-        existing = result.fetchone()
-
-        graph_json = json.dumps(graph)
-
-        if existing:
-            # Update
-            conn.execute(
-                text("""
-                    UPDATE user_interest_graph
-                    SET graph = :graph, updated_at = NOW()
-                    WHERE external_user_id = :uid
-                """),
-                {'graph': graph_json, 'uid': user_id}
-            )
-        else:
-            # Insert
-            conn.execute(
-                text("""
-                    INSERT INTO user_interest_graph (external_user_id, graph, created_at, updated_at)
-                    VALUES (:uid, :graph, NOW(), NOW())
-                """),
-                {'uid': user_id, 'graph': graph_json}
-            )
 
-        conn.commit()
+async def save_interest_graph(db_url: str, user_id: str, graph: Dict[str, Any]):
+    """حفظ Interest Graph في قاعدة البيانات (upsert واحد)"""
+    pool = await get_pool(db_url)
+
+    # Native upsert: one round-trip instead of SELECT + UPDATE/INSERT, and
+    # no race window between concurrent generators for the same user
+    await pool.execute(
+        """
+        INSERT INTO user_interest_graph (external_user_id, graph, created_at, updated_at)
+        VALUES ($1, $2::jsonb, NOW(), NOW())
+        ON CONFLICT (external_user_id) DO UPDATE
+        SET graph = EXCLUDED.graph, updated_at = NOW()
+        """,
+        user_id, _json_dumps(graph)
+    )
 
 
 def generate_interest_graph(
@@ -317,111 +450,199 @@ def generate_interest_graph(
     api_key: Optional[str] = None,
     days: int = 90
 ) -> bool:
-    """توليد Interest Graph لمستخدم واحد"""
+    """توليد Interest Graph لمستخدم واحد (sync wrapper للـ CLI)"""
+    print(f"🔍 Processing user {user_id}...")
+    return asyncio.run(generate_interest_graph_async(
+        db_url=db_url,
+        user_id=user_id,
+        llm_provider=llm_provider,
+        api_key=api_key,
+        days=days
+    ))
 
-    print(f"🔍 Fetching user summary for {user_id}...")
 
-    summary = fetch_user_summary(db_url, user_id, days=days)
+async def generate_interest_graph_async(
+    db_url: str,
+    user_id: str,
+    llm_provider: str = 'anthropic',
+    api_key: Optional[str] = None,
+    days: int = 90
+) -> bool:
+    """توليد Interest Graph لمستخدم واحد (async)
+
+    DB access runs in a worker thread; the LLM round-trip awaits the async
+    client so many users can be in flight at once.
+    """
+    summary = await fetch_user_summary(db_url, user_id, days=days)
 
     if not summary:
         print(f"⚠️  No interactions found for user {user_id}")
         return False
 
-    print(f"✓ Found {summary.total_plays} plays, {summary.unique_tracks} unique tracks")
-
-    # Build LLM prompt
     prompt = build_llm_prompt(summary)
 
-    print(f"🤖 Calling {llm_provider} LLM...")
-
-    # Call LLM
-    if llm_provider == 'anthropic':
-        api_key = api_key or os.getenv('ANTHROPIC_API_KEY')
-        if not api_key:
-            print("❌ ANTHROPIC_API_KEY not set")
-            return False
-        response = call_anthropic_llm(prompt, api_key)
-    elif llm_provider == 'openai':
-        api_key = api_key or os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            print("❌ OPENAI_API_KEY not set")
+    # Content-addressed cache: an unchanged summary produces an identical
+    # prompt, so the stored response is reused without an LLM round-trip
+    cache_key = hashlib.blake2b(prompt.encode('utf-8'), digest_size=32).hexdigest()
+    response = await _get_cached_llm_response(db_url, cache_key)
+    cache_hit = response is not None
+    if cache_hit:
+        print(f"⚡ LLM cache hit for user {user_id}")
+
+    if response is None:
+        if llm_provider == 'anthropic':
+            key = api_key or os.getenv('ANTHROPIC_API_KEY')
+            if not key:
+                print("❌ ANTHROPIC_API_KEY not set")
+                return False
+            response = await call_anthropic_llm_async(prompt, key)
+        elif llm_provider == 'openai':
+            key = api_key or os.getenv('OPENAI_API_KEY')
+            if not key:
+                print("❌ OPENAI_API_KEY not set")
+                return False
+            response = await call_openai_llm_async(prompt, key)
+        else:
+            print(f"❌ Unknown LLM provider: {llm_provider}")
             return False
-        response = call_openai_llm(prompt, api_key)
-    else:
-        print(f"❌ Unknown LLM provider: {llm_provider}")
-        return False
 
     if not response:
-        print("❌ LLM returned empty response")
+        print(f"❌ LLM returned empty response for user {user_id}")
         return False
 
-    # Parse response
     graph = parse_llm_response(response)
 
     if not graph:
-        print("❌ Failed to parse LLM response as JSON")
-        print(f"Response: {response[:500]}...")
+        print(f"❌ Failed to parse LLM response as JSON for user {user_id}")
+        # Drop a poisoned entry so the next run re-calls the LLM instead of
+        # replaying the same unparseable response forever
+        if cache_hit:
+            await _delete_cached_llm_response(db_url, cache_key)
         return False
 
-    print(f"✓ Generated Interest Graph with {len(graph.get('insights', []))} insights")
+    # Cache only responses that parse
+    if not cache_hit:
+        await _store_cached_llm_response(db_url, cache_key, response)
 
-    # Save to DB
-    print(f"💾 Saving to database...")
-    save_interest_graph(db_url, user_id, graph)
+    await save_interest_graph(db_url, user_id, graph)
 
     print(f"✅ Interest Graph saved for user {user_id}")
 
     return True
 
 
+# Stale users only: anyone with no stored graph, or with interactions newer
+# than their graph's updated_at. Unchanged users would reproduce the same
+# prompt, so re-running them is a wasted LLM call.
+_SQL_STALE_USERS = """
+SELECT i.external_user_id, COUNT(*) as interaction_count
+FROM interactions i
+LEFT JOIN user_interest_graph g ON g.external_user_id = i.external_user_id
+WHERE i.created_at > NOW() - INTERVAL '90 days'
+GROUP BY i.external_user_id, g.updated_at
+HAVING COUNT(*) >= $1
+   AND (g.updated_at IS NULL OR MAX(i.created_at) > g.updated_at)
+ORDER BY COUNT(*) DESC
+LIMIT $2
+"""
+
+
+def _process_user_shard(
+    db_url: str,
+    user_ids: List[str],
+    llm_provider: str,
+    api_key: Optional[str],
+    max_concurrency: int,
+) -> tuple:
+    """Process one shard of users in the current process.
+
+    Runs its own event loop, which also means its own asyncpg pool and its
+    own HTTP sessions. Returns (success, fail) counts.
+    """
+    # With the fork start method the child inherits the parent's _POOL;
+    # those sockets belong to the parent's loop, so drop the reference and
+    # let get_pool() build a fresh pool on this process's loop.
+    global _POOL, _POOL_LOOP
+    _POOL = None
+    _POOL_LOOP = None
+
+    # The workload is network-bound on the LLM round-trip; a semaphore-bounded
+    # gather keeps max_concurrency requests in flight instead of paying one
+    # full round-trip per user serially. All DB access shares one asyncpg pool.
+    async def _run() -> List[Any]:
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def _one(user_id: str):
+            async with sem:
+                return await generate_interest_graph_async(
+                    db_url=db_url,
+                    user_id=user_id,
+                    llm_provider=llm_provider,
+                    api_key=api_key
+                )
+
+        return await asyncio.gather(
+            *(_one(uid) for uid in user_ids),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(_run())
+
+    success_count = sum(1 for r in results if r is True)
+    for r in results:
+        if isinstance(r, Exception):
+            print(f"❌ Error processing user: {r}")
+
+    return success_count, len(results) - success_count
+
+
 def generate_all_users(
     db_url: str,
     llm_provider: str = 'anthropic',
     api_key: Optional[str] = None,
     batch_size: int = 100,
-    min_interactions: int = 10
+    min_interactions: int = 10,
+    max_concurrency: int = 8,
+    num_workers: int = 1
 ):
     """توليد Interest Graph لكل المستخدمين"""
 
-    engine = create_engine(db_url)
-
-    # Get active users
-    query = f"""
-    SELECT external_user_id, COUNT(*) as interaction_count
-    FROM interactions
-    GROUP BY external_user_id
-    HAVING COUNT(*) >= {min_interactions}
-    ORDER BY COUNT(*) DESC
-    LIMIT {batch_size}
-    """
-
-    df = pd.read_sql(query, engine)
-
-    print(f"📊 Found {len(df)} users with >= {min_interactions} interactions")
+    async def _fetch_user_ids() -> List[str]:
+        pool = await get_pool(db_url)
+        rows = await pool.fetch(_SQL_STALE_USERS, min_interactions, batch_size)
+        return [r['external_user_id'] for r in rows]
 
-    success_count = 0
-    fail_count = 0
+    user_ids = asyncio.run(_fetch_user_ids())
 
-    for idx, row in df.iterrows():
-        user_id = row['external_user_id']
-        print(f"\n[{idx + 1}/{len(df)}] Processing user: {user_id}")
+    print(f"📊 Found {len(user_ids)} users with >= {min_interactions} interactions")
+    print(f"🚀 Running with up to {max_concurrency} concurrent LLM calls per worker")
 
-        try:
-            success = generate_interest_graph(
-                db_url=db_url,
-                user_id=user_id,
-                llm_provider=llm_provider,
-                api_key=api_key
-            )
+    num_workers = max(1, min(num_workers, len(user_ids) or 1))
 
-            if success:
-                success_count += 1
-            else:
-                fail_count += 1
-
-        except Exception as e:
-            print(f"❌ Error processing user {user_id}: {e}")
-            fail_count += 1
+    if num_workers == 1:
+        success_count, fail_count = _process_user_shard(
+            db_url, user_ids, llm_provider, api_key, max_concurrency
+        )
+    else:
+        # Summary building and JSON parsing are CPU-bound, so one event loop
+        # saturates a single core once LLM concurrency is high enough.
+        # Shard users round-robin across worker processes, each with its own
+        # event loop, asyncpg pool and LLM client.
+        print(f"⚡ Sharding across {num_workers} worker processes")
+        shards = [user_ids[w::num_workers] for w in range(num_workers)]
+        success_count = fail_count = 0
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            futures = [
+                executor.submit(
+                    _process_user_shard,
+                    db_url, shard, llm_provider, api_key, max_concurrency
+                )
+                for shard in shards
+            ]
+            for future in futures:
+                ok, failed = future.result()
+                success_count += ok
+                fail_count += failed
 
     print(f"\n📈 Summary:")
     print(f"   ✅ Success: {success_count}")
@@ -438,6 +659,8 @@ def main():
     parser.add_argument('--batch-size', type=int, default=100, help='Number of users to process (for --all-users)')
     parser.add_argument('--min-interactions', type=int, default=10, help='Minimum interactions required')
     parser.add_argument('--days', type=int, default=90, help='Days of history to analyze')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='Concurrent LLM calls per worker (for --all-users)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes to shard users across (for --all-users)')
 
     args = parser.parse_args()
 
@@ -451,7 +674,9 @@ def main():
             llm_provider=args.provider,
             api_key=args.api_key,
             batch_size=args.batch_size,
-            min_interactions=args.min_interactions
+            min_interactions=args.min_interactions,
+            max_concurrency=args.max_concurrency,
+            num_workers=args.workers
         )
     elif args.user_id:
         success = generate_interest_graph(
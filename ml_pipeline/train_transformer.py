@@ -17,7 +17,6 @@ from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
 import numpy as np
-import pandas as pd
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
@@ -34,38 +33,135 @@ class InteractionDataset(Dataset):
         self,
         sequences: List[List[int]],
         max_len: int = 50,
-        mask_prob: float = 0.15
+        mask_prob: float = 0.15,
+        mode: str = 'train'
     ):
-        self.sequences = sequences
         self.max_len = max_len
         self.mask_prob = mask_prob
+        self.mode = mode
+
+        # Per-user temporal holdout: each user's last item is never seen in
+        # training; 'val' mode predicts exactly that item from the rest of
+        # the history. Tokenization happens once up front: __getitem__ runs
+        # millions of times per epoch, so the per-sample slicing/padding
+        # work is paid here in a single pass and __getitem__ just hands out
+        # tensor views.
+        width = max_len - 1
+        self.inputs = torch.zeros((len(sequences), width), dtype=torch.long)
+        if mode == 'train':
+            self.labels = torch.zeros((len(sequences), width), dtype=torch.long)
+        else:
+            self.targets = torch.zeros(len(sequences), dtype=torch.long)
+
+        for i, seq in enumerate(sequences):
+            if mode == 'val':
+                self.targets[i] = seq[-1]
+                seq = seq[:-1]
+                t = torch.as_tensor(seq[-width:], dtype=torch.long)
+                # Left-padding: the sequence ends at the last position
+                self.inputs[i, -len(t):] = t
+                continue
+
+            # Train mode: drop the held-out last item, then shift by one
+            seq = seq[:-1][-max_len:]
+            length = len(seq) - 1
+            if length <= 0:
+                continue
+            t = torch.as_tensor(seq, dtype=torch.long)
+            self.inputs[i, -length:] = t[:-1]
+            self.labels[i, -length:] = t[1:]
 
     def __len__(self) -> int:
-        return len(self.sequences)
+        return self.inputs.shape[0]
 
     def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
-        seq = self.sequences[idx]
+        input_ids = self.inputs[idx]
+        item = {
+            'input_ids': input_ids,
+            'attention_mask': (input_ids != 0).long()
+        }
+        if self.mode == 'train':
+            item['labels'] = self.labels[idx]
+        else:
+            item['target'] = self.targets[idx]
+        return item
 
-        # Pad or truncate to max_len
-        if len(seq) > self.max_len:
-            seq = seq[-self.max_len:]
 
-        # Create input (all but last) and target (all but first)
-        # For next-item prediction
-        input_seq = seq[:-1]
-        target_seq = seq[1:]
+class CausalSelfAttention(nn.Module):
+    """Causal multi-head attention on the fused SDPA kernel.
 
-        # Padding
-        pad_len = self.max_len - 1 - len(input_seq)
-        if pad_len > 0:
-            input_seq = [0] * pad_len + input_seq
-            target_seq = [0] * pad_len + target_seq
+    F.scaled_dot_product_attention dispatches to a FlashAttention-style
+    kernel that never materializes the (seq_len x seq_len) score matrix in
+    HBM, unlike nn.TransformerEncoder with an explicit -inf mask.
+    """
 
-        return {
-            'input_ids': torch.LongTensor(input_seq),
-            'labels': torch.LongTensor(target_seq),
-            'attention_mask': torch.LongTensor([1 if x != 0 else 0 for x in input_seq])
-        }
+    def __init__(self, embedding_dim: int, num_heads: int, dropout: float, max_seq_len: int = 50):
+        super().__init__()
+        assert embedding_dim % num_heads == 0
+        self.num_heads = num_heads
+        self.head_dim = embedding_dim // num_heads
+        self.dropout_p = dropout
+        self.qkv = nn.Linear(embedding_dim, 3 * embedding_dim)
+        self.proj = nn.Linear(embedding_dim, embedding_dim)
+
+        # Precomputed lower-triangular mask for the padded branch; sliced
+        # per batch instead of rebuilt every forward pass
+        self.register_buffer(
+            'causal_mask',
+            torch.ones(max_seq_len, max_seq_len, dtype=torch.bool).tril(),
+            persistent=False,
+        )
+
+    def forward(
+        self,
+        x: torch.Tensor,
+        key_padding_mask: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        batch_size, seq_len, dim = x.shape
+
+        q, k, v = self.qkv(x).chunk(3, dim=-1)
+        q = q.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+        k = k.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+        v = v.view(batch_size, seq_len, self.num_heads, self.head_dim).transpose(1, 2)
+
+        dropout_p = self.dropout_p if self.training else 0.0
+        if key_padding_mask is None:
+            # is_causal hits the fastest kernel path (no mask tensor at all)
+            y = F.scaled_dot_product_attention(q, k, v, dropout_p=dropout_p, is_causal=True)
+        else:
+            # Fold padding into a boolean causal mask; the memory-efficient
+            # kernel still applies
+            mask = self.causal_mask[:seq_len, :seq_len] & ~key_padding_mask[:, None, None, :]
+            y = F.scaled_dot_product_attention(q, k, v, attn_mask=mask, dropout_p=dropout_p)
+
+        y = y.transpose(1, 2).reshape(batch_size, seq_len, dim)
+        return self.proj(y)
+
+
+class SASRecBlock(nn.Module):
+    """Pre-LayerNorm {causal attention, FFN} block"""
+
+    def __init__(self, embedding_dim: int, num_heads: int, dropout: float, max_seq_len: int = 50):
+        super().__init__()
+        self.norm1 = nn.LayerNorm(embedding_dim)
+        self.attn = CausalSelfAttention(embedding_dim, num_heads, dropout, max_seq_len)
+        self.norm2 = nn.LayerNorm(embedding_dim)
+        self.ffn = nn.Sequential(
+            nn.Linear(embedding_dim, embedding_dim * 4),
+            nn.GELU(),
+            nn.Dropout(dropout),
+            nn.Linear(embedding_dim * 4, embedding_dim),
+        )
+        self.dropout = nn.Dropout(dropout)
+
+    def forward(
+        self,
+        x: torch.Tensor,
+        key_padding_mask: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        x = x + self.dropout(self.attn(self.norm1(x), key_padding_mask))
+        x = x + self.dropout(self.ffn(self.norm2(x)))
+        return x
 
 
 class SASRecModel(nn.Module):
@@ -93,19 +189,26 @@ class SASRecModel(nn.Module):
         self.item_embedding = nn.Embedding(num_items + 1, embedding_dim, padding_idx=0)
         self.position_embedding = nn.Embedding(max_seq_len, embedding_dim)
 
-        # Transformer encoder
-        encoder_layer = nn.TransformerEncoderLayer(
-            d_model=embedding_dim,
-            nhead=num_heads,
-            dim_feedforward=embedding_dim * 4,
-            dropout=dropout,
-            activation='gelu',
-            batch_first=True
+        # Precomputed position indices, sliced per batch in encode(). A
+        # buffer moves with .to(device) and is non-persistent so it never
+        # bloats checkpoints.
+        self.register_buffer(
+            'position_ids',
+            torch.arange(max_seq_len).unsqueeze(0),
+            persistent=False,
         )
-        self.transformer = nn.TransformerEncoder(encoder_layer, num_layers=num_layers)
 
-        # Output layer
-        self.output_layer = nn.Linear(embedding_dim, num_items + 1)
+        # Transformer encoder: SDPA-fused causal blocks (see CausalSelfAttention)
+        self.blocks = nn.ModuleList([
+            SASRecBlock(embedding_dim, num_heads, dropout, max_seq_len)
+            for _ in range(num_layers)
+        ])
+        self.final_norm = nn.LayerNorm(embedding_dim)
+
+        # Output projection is tied to the item embedding (standard weight
+        # tying): halves the dominant parameter for large catalogs and keeps
+        # the scoring space consistent with the input space.
+        self.output_bias = nn.Parameter(torch.zeros(num_items + 1))
 
         self.dropout = nn.Dropout(dropout)
 
@@ -122,42 +225,56 @@ class SASRecModel(nn.Module):
                 if module.bias is not None:
                     nn.init.zeros_(module.bias)
 
-    def forward(
+    def encode(
         self,
         input_ids: torch.Tensor,
         attention_mask: Optional[torch.Tensor] = None
     ) -> torch.Tensor:
         """
+        Encode a sequence to hidden states, without the output projection.
+
         Args:
             input_ids: (batch_size, seq_len)
             attention_mask: (batch_size, seq_len)
 
         Returns:
-            logits: (batch_size, seq_len, num_items)
+            hidden: (batch_size, seq_len, embedding_dim)
         """
         batch_size, seq_len = input_ids.shape
 
-        # Position indices
-        position_ids = torch.arange(seq_len, device=input_ids.device).unsqueeze(0).expand(batch_size, -1)
-
-        # Embeddings
+        # Embeddings (position indices come from the registered buffer;
+        # broadcasting handles the batch dimension)
         item_emb = self.item_embedding(input_ids)
-        pos_emb = self.position_embedding(position_ids)
+        pos_emb = self.position_embedding(self.position_ids[:, :seq_len])
 
         # Combine embeddings
         x = self.dropout(item_emb + pos_emb)
 
-        # Create causal mask (prevent looking ahead)
-        causal_mask = torch.triu(
-            torch.ones(seq_len, seq_len, device=input_ids.device) * float('-inf'),
-            diagonal=1
-        )
+        # Causality lives inside the SDPA kernel; no explicit -inf mask is
+        # ever materialized
+        key_padding_mask = (attention_mask == 0) if attention_mask is not None else None
+        for block in self.blocks:
+            x = block(x, key_padding_mask)
 
-        # Apply transformer
-        x = self.transformer(x, mask=causal_mask, src_key_padding_mask=(attention_mask == 0) if attention_mask is not None else None)
+        return self.final_norm(x)
 
-        # Output projection
-        logits = self.output_layer(x)
+    def forward(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """
+        Args:
+            input_ids: (batch_size, seq_len)
+            attention_mask: (batch_size, seq_len)
+
+        Returns:
+            logits: (batch_size, seq_len, num_items)
+        """
+        x = self.encode(input_ids, attention_mask)
+
+        # Output projection against the tied embedding table
+        logits = F.linear(x, self.item_embedding.weight, self.output_bias)
 
         return logits
 
@@ -211,7 +328,8 @@ class SASRecLightningModule(pl.LightningModule):
         dropout: float = 0.1,
         max_seq_len: int = 50,
         learning_rate: float = 1e-3,
-        weight_decay: float = 0.01
+        weight_decay: float = 0.01,
+        num_negatives: int = 128
     ):
         super().__init__()
         self.save_hyperparameters()
@@ -225,6 +343,17 @@ class SASRecLightningModule(pl.LightningModule):
             max_seq_len=max_seq_len
         )
 
+        # Fuse the embedding-add-dropout-attention prologue; reduce-overhead
+        # mode also CUDA-graphs the small fixed-shape steps. encode() is
+        # compiled directly because both steps call it — compiling the
+        # module would only cover forward()/__call__, which the training
+        # loop never goes through.
+        self._encode = self.model.encode
+        if torch.cuda.is_available():
+            self._encode = torch.compile(
+                self.model.encode, mode='reduce-overhead', fullgraph=False
+            )
+
         self.criterion = nn.CrossEntropyLoss(ignore_index=0)
 
     def forward(self, input_ids, attention_mask=None):
@@ -235,30 +364,59 @@ class SASRecLightningModule(pl.LightningModule):
         labels = batch['labels']
         attention_mask = batch['attention_mask']
 
-        logits = self.forward(input_ids, attention_mask)
-
-        # Reshape for loss calculation
-        loss = self.criterion(
-            logits.view(-1, self.model.num_items + 1),
-            labels.view(-1)
+        # Sampled softmax: score the positive plus K uniform negatives per
+        # position instead of the full num_items-wide projection — the full
+        # matmul is the dominant FLOP for large catalogs. Validation still
+        # uses the exact full-softmax loss.
+        x = self._encode(input_ids, attention_mask)  # (B, T, D)
+        item_embedding = self.model.item_embedding
+
+        pos_emb = item_embedding(labels)  # (B, T, D)
+        pos_logits = (x * pos_emb).sum(-1).float()  # (B, T)
+
+        k = self.hparams.num_negatives
+        neg_ids = torch.randint(
+            1, self.hparams.num_items + 1,
+            (*labels.shape, k),
+            device=labels.device
         )
+        neg_emb = item_embedding(neg_ids)  # (B, T, K, D)
+        neg_logits = torch.einsum('btd,btkd->btk', x, neg_emb).float()  # (B, T, K)
+
+        mask = (labels != 0).float()
+        denom = mask.sum().clamp(min=1.0)
+        pos_loss = -(F.logsigmoid(pos_logits) * mask).sum() / denom
+        neg_loss = -(F.logsigmoid(-neg_logits) * mask.unsqueeze(-1)).sum() / (denom * k)
+        loss = pos_loss + neg_loss
 
         self.log('train_loss', loss, prog_bar=True)
         return loss
 
     def validation_step(self, batch, batch_idx):
         input_ids = batch['input_ids']
-        labels = batch['labels']
+        target = batch['target']
         attention_mask = batch['attention_mask']
 
-        logits = self.forward(input_ids, attention_mask)
+        # Score only the last position against the held-out next item —
+        # one softmax row per user instead of one per sequence position
+        x = self._encode(input_ids, attention_mask)[:, -1, :]
+        logits = F.linear(
+            x, self.model.item_embedding.weight, self.model.output_bias
+        ).float()
+
+        loss = self.criterion(logits, target)
 
-        loss = self.criterion(
-            logits.view(-1, self.model.num_items + 1),
-            labels.view(-1)
+        top10 = logits.topk(10, dim=-1).indices
+        hits = (top10 == target.unsqueeze(-1)).float()
+        hr10 = hits.sum(-1).mean()
+        discounts = torch.log2(
+            torch.arange(2, 12, device=hits.device, dtype=torch.float)
         )
+        ndcg10 = (hits / discounts).sum(-1).mean()
 
         self.log('val_loss', loss, prog_bar=True)
+        self.log('val_hr10', hr10, prog_bar=True)
+        self.log('val_ndcg10', ndcg10)
         return loss
 
     def configure_optimizers(self):
@@ -285,56 +443,84 @@ class SASRecLightningModule(pl.LightningModule):
         }
 
 
-def load_interactions_from_db(db_url: str) -> pd.DataFrame:
-    """Load interaction data from PostgreSQL"""
+# Server-side cursor batch size for the interactions stream
+_STREAM_BATCH_ROWS = 50_000
+
+
+def load_sequences_from_db(
+    db_url: str,
+    min_seq_len: int = 3
+) -> Tuple[List[np.ndarray], Dict[str, int], Dict[int, str]]:
+    """Stream interactions into per-user index sequences.
+
+    A named (server-side) cursor fetches 50k rows at a time, so the full
+    table never sits in RAM as a DataFrame; rows land directly in SoA int
+    columns (user, track, timestamp). Ordering is done client-side with one
+    np.lexsort and users are split on index boundaries — no Python groupby.
+
+    Returns (sequences, track_to_idx, idx_to_track); index 0 is padding.
+    """
     engine = create_engine(db_url)
 
     query = """
-    SELECT
-        external_user_id,
-        track_id,
-        event_type,
-        created_at,
-        EXTRACT(EPOCH FROM created_at) as timestamp
+    SELECT external_user_id, track_id, EXTRACT(EPOCH FROM created_at) as ts
     FROM interactions
     WHERE event_type IN ('PLAY', 'LIKE', 'SKIP')
-    ORDER BY external_user_id, created_at
     """
 
-    df = pd.read_sql(query, engine)
-    return df
-
+    user_to_idx: Dict[str, int] = {}
+    track_to_idx: Dict[str, int] = {}
+    user_chunks: List[np.ndarray] = []
+    track_chunks: List[np.ndarray] = []
+    ts_chunks: List[np.ndarray] = []
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor(name='interactions_stream')
+        try:
+            cur.itersize = _STREAM_BATCH_ROWS
+            cur.execute(query)
+            while True:
+                rows = cur.fetchmany(_STREAM_BATCH_ROWS)
+                if not rows:
+                    break
+                n = len(rows)
+                user_chunks.append(np.fromiter(
+                    (user_to_idx.setdefault(r[0], len(user_to_idx)) for r in rows),
+                    dtype=np.int64, count=n
+                ))
+                track_chunks.append(np.fromiter(
+                    (track_to_idx.setdefault(r[1], len(track_to_idx) + 1) for r in rows),
+                    dtype=np.int32, count=n
+                ))
+                ts_chunks.append(np.fromiter(
+                    (r[2] for r in rows), dtype=np.float64, count=n
+                ))
+        finally:
+            cur.close()
+    finally:
+        raw.close()
+
+    if not user_chunks:
+        return [], {}, {}
+
+    user_col = np.concatenate(user_chunks)
+    track_col = np.concatenate(track_chunks)
+    ts_col = np.concatenate(ts_chunks)
+
+    # Sort by (user, timestamp), then split the track column at user boundaries
+    order = np.lexsort((ts_col, user_col))
+    user_col = user_col[order]
+    track_col = track_col[order]
+
+    boundaries = np.nonzero(np.diff(user_col))[0] + 1
+    sequences = [
+        seq for seq in np.split(track_col, boundaries)
+        if len(seq) >= min_seq_len
+    ]
 
-def build_item_vocab(df: pd.DataFrame) -> Tuple[Dict[str, int], Dict[int, str]]:
-    """Build vocabulary mapping: track_id -> index"""
-    unique_tracks = df['track_id'].unique()
-
-    # 0 is reserved for padding
-    track_to_idx = {track: idx + 1 for idx, track in enumerate(unique_tracks)}
     idx_to_track = {idx: track for track, idx in track_to_idx.items()}
-
-    return track_to_idx, idx_to_track
-
-
-def create_user_sequences(
-    df: pd.DataFrame,
-    track_to_idx: Dict[str, int],
-    min_seq_len: int = 3
-) -> List[List[int]]:
-    """Create sequential data per user"""
-    sequences = []
-
-    for user_id, group in df.groupby('external_user_id'):
-        # Sort by timestamp
-        user_tracks = group.sort_values('timestamp')['track_id'].tolist()
-
-        # Convert to indices
-        user_seq = [track_to_idx[t] for t in user_tracks if t in track_to_idx]
-
-        if len(user_seq) >= min_seq_len:
-            sequences.append(user_seq)
-
-    return sequences
+    return sequences, track_to_idx, idx_to_track
 
 
 def train_sasrec(
@@ -346,38 +532,36 @@ def train_sasrec(
     embedding_dim: int = 128,
     num_heads: int = 4,
     num_layers: int = 2,
-    learning_rate: float = 1e-3,
-    val_split: float = 0.1
+    learning_rate: float = 1e-3
 ):
     """Main training function"""
 
     print(f"🎵 Starting SASRec training...")
     print(f"📊 Loading data from database...")
 
-    # Load data
-    df = load_interactions_from_db(db_url)
-    print(f"✓ Loaded {len(df)} interactions from {df['external_user_id'].nunique()} users")
-
-    # Build vocabulary
-    track_to_idx, idx_to_track = build_item_vocab(df)
+    # Load data (streamed; sequences and vocab are built in one pass)
+    sequences, track_to_idx, idx_to_track = load_sequences_from_db(db_url, min_seq_len=3)
     num_items = len(track_to_idx)
     print(f"✓ Vocabulary size: {num_items} tracks")
-
-    # Create sequences
-    sequences = create_user_sequences(df, track_to_idx, min_seq_len=3)
     print(f"✓ Created {len(sequences)} user sequences")
 
-    # Train/val split
-    split_idx = int(len(sequences) * (1 - val_split))
-    train_sequences = sequences[:split_idx]
-    val_sequences = sequences[split_idx:]
-
-    # Create datasets
-    train_dataset = InteractionDataset(train_sequences, max_len=max_seq_len)
-    val_dataset = InteractionDataset(val_sequences, max_len=max_seq_len)
-
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True, num_workers=4)
-    val_loader = DataLoader(val_dataset, batch_size=batch_size, num_workers=4)
+    # Per-user temporal holdout: every user trains on their history minus
+    # the last item and is validated on predicting that held-out item. A
+    # positional slice would put disjoint users in train and val (the
+    # sequences come out grouped by user id), which measures cold-start
+    # generalization rather than next-item accuracy.
+    train_dataset = InteractionDataset(sequences, max_len=max_seq_len, mode='train')
+    val_dataset = InteractionDataset(sequences, max_len=max_seq_len, mode='val')
+
+    loader_kwargs = dict(
+        batch_size=batch_size,
+        num_workers=os.cpu_count() or 4,
+        pin_memory=True,
+        persistent_workers=True,
+        prefetch_factor=4,
+    )
+    train_loader = DataLoader(train_dataset, shuffle=True, **loader_kwargs)
+    val_loader = DataLoader(val_dataset, **loader_kwargs)
 
     # Create model
     model = SASRecLightningModule(
@@ -405,14 +589,18 @@ def train_sasrec(
         verbose=True
     )
 
+    # BF16 halves activation bandwidth and doubles tensor-core throughput on
+    # Ampere+; fall back to fp32 where unsupported (CPU, older GPUs)
+    use_bf16 = torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+
     # Trainer
     trainer = pl.Trainer(
         max_epochs=epochs,
         callbacks=[checkpoint_callback, early_stop_callback],
         accelerator='auto',
         devices=1,
-        log_every_n_steps=10,
-        val_check_interval=0.5
+        precision='bf16-mixed' if use_bf16 else '32-true',
+        log_every_n_steps=10
     )
 
     # Train
@@ -422,9 +610,11 @@ def train_sasrec(
     # Save final model
     print(f"💾 Saving model to {output_path}...")
 
-    # Save model state + vocabulary
+    # Save model state + vocabulary (torch.compile wraps only the bound
+    # encode, so the module's state-dict keys are already clean)
+    raw_model = model.model
     torch.save({
-        'model_state_dict': model.model.state_dict(),
+        'model_state_dict': raw_model.state_dict(),
         'track_to_idx': track_to_idx,
         'idx_to_track': idx_to_track,
         'num_items': num_items,
@@ -436,6 +626,51 @@ def train_sasrec(
         }
     }, output_path)
 
+    # Also export a dynamically quantized int8 copy for CPU serving: the
+    # Linear layers (qkv/proj/ffn) dominate inference time and shrink ~4x
+    # with negligible ranking loss. The FP32 checkpoint above stays the
+    # source of truth for resuming training.
+    quantized_path = str(Path(output_path).with_suffix('')) + '.int8.pt'
+    print(f"💾 Exporting int8 quantized model to {quantized_path}...")
+    quantized = torch.ao.quantization.quantize_dynamic(
+        raw_model.to('cpu').eval(), {nn.Linear}, dtype=torch.qint8
+    )
+    torch.save({
+        'model_state_dict': quantized.state_dict(),
+        'track_to_idx': track_to_idx,
+        'idx_to_track': idx_to_track,
+        'num_items': num_items,
+        'quantized': True,
+        'hyperparameters': {
+            'embedding_dim': embedding_dim,
+            'num_heads': num_heads,
+            'num_layers': num_layers,
+            'max_seq_len': max_seq_len
+        }
+    }, quantized_path)
+
+    # Fast-load artifacts: safetensors weights are mmap-friendly and load
+    # zero-copy, and the vocab as parallel numpy arrays skips pickling a
+    # million str->int dict entries one Python object at a time. The .pt
+    # checkpoint above remains the canonical artifact; these are additive,
+    # so loaders can adopt them incrementally.
+    try:
+        from safetensors.torch import save_file
+
+        weights_path = output_path + '.safetensors'
+        save_file(raw_model.state_dict(), weights_path)
+        print(f"💾 Exported safetensors weights to {weights_path}")
+    except ImportError:
+        print("⚠️  safetensors not installed, skipping .safetensors export")
+
+    vocab_path = output_path + '.vocab.npz'
+    np.savez_compressed(
+        vocab_path,
+        tracks=np.array(list(track_to_idx.keys())),
+        idx=np.array(list(track_to_idx.values()), dtype=np.int64),
+    )
+    print(f"💾 Exported vocabulary to {vocab_path}")
+
     print(f"✅ Training complete! Model saved to {output_path}")
 
     return {
@@ -456,7 +691,6 @@ def main():
     parser.add_argument('--num-heads', type=int, default=4, help='Number of attention heads')
     parser.add_argument('--num-layers', type=int, default=2, help='Number of transformer layers')
     parser.add_argument('--learning-rate', type=float, default=1e-3, help='Learning rate')
-    parser.add_argument('--val-split', type=float, default=0.1, help='Validation split ratio')
 
     args = parser.parse_args()
 
@@ -477,8 +711,7 @@ def main():
         embedding_dim=args.embedding_dim,
         num_heads=args.num_heads,
         num_layers=args.num_layers,
-        learning_rate=args.learning_rate,
-        val_split=args.val_split
+        learning_rate=args.learning_rate
     )
 
     print(f"\n📈 Training Results:")